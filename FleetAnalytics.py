@@ -0,0 +1,331 @@
+import argparse, glob, json, os
+from datetime import datetime, timezone
+
+import numpy as np
+
+from SnapshotRecords import SnapshotRecord
+
+
+# Same directory SaveData writes to; not imported so reporting hosts do not need ppadb
+DATA_DIR = "PhoneDataCollector/DataCollected/"
+COLUMNS = {
+    "device": np.int32,
+    "timestamp": np.float64,
+    "battery_level": np.float32,
+    "charging": np.bool_,
+    "rssi": np.float32,
+    "storage_used": np.float64,
+    "foreground_app": np.int32
+}
+CHARGING_STATES = ("Charging", "Full")
+RSSI_BINS = np.arange(-100, -19, 10)
+
+
+class SnapshotHistory:
+    """
+    Snapshot history stored column-wise, one NumPy array per metric, rows sorted by (device, timestamp).
+    Devices and foreground apps are stored as integer codes into the `devices` and `apps` lists
+    """
+
+    def __init__(self, columns, devices, apps):
+        self.columns = columns
+        self.devices = devices
+        self.apps = apps
+
+    def __len__(self):
+        return len(self.columns["timestamp"])
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    @classmethod
+    def FromSnapshots(cls, snapshots):
+        devices, apps = {}, {}
+        rows = {name: [] for name in COLUMNS}
+        unidentified = 0
+
+        for data in snapshots:
+            record = SnapshotRecord.FromSnapshot(data)
+            try:
+                ts = datetime.strptime(record.timestamp, "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc)
+            except (TypeError, ValueError):
+                continue
+
+            # Snapshots saved before Serial was recorded cannot be told apart (a fleet is often one model),
+            # and mixing phones would pair readings across devices in every interval metric
+            if not record.serial:
+                unidentified += 1
+                continue
+            key = record.serial
+            battery, storage = record.battery, record.storage
+            package = record.foreground and record.foreground.package
+
+            rows["device"].append(devices.setdefault(key, len(devices)))
+            rows["timestamp"].append(ts.timestamp())
+            rows["battery_level"].append(battery.percent if battery and battery.percent is not None else np.nan)
+            rows["charging"].append(bool(battery and battery.status in CHARGING_STATES))
+            rssi = record.network.wifi_rssi if record.network else None
+            rows["rssi"].append(np.nan if rssi is None else rssi)
+            used = storage.used_bytes if storage else None
+            rows["storage_used"].append(np.nan if used is None else used)
+            rows["foreground_app"].append(apps.setdefault(package, len(apps)) if package else -1)
+
+        if unidentified:
+            print(f"⚠️ Skipped {unidentified} snapshots without a device serial (saved before serials were recorded)")
+
+        columns = {name: np.asarray(values, dtype=COLUMNS[name]) for name, values in rows.items()}
+        order = np.lexsort((columns["timestamp"], columns["device"]))
+        columns = {name: values[order] for name, values in columns.items()}
+        return cls(columns, list(devices), list(apps))
+
+    @classmethod
+    def FromDirectory(cls, data_dir):
+        return cls.FromSnapshots(_IterSnapshots(_JsonFiles(data_dir)))
+
+    def Save(self, cache_dir, sources=None):
+        os.makedirs(cache_dir, exist_ok=True)
+        for name, values in self.columns.items():
+            np.save(os.path.join(cache_dir, f"{name}.npy"), values)
+        with open(os.path.join(cache_dir, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"devices": self.devices, "apps": self.apps, "sources": sources}, f, ensure_ascii=False)
+
+    @classmethod
+    def Load(cls, cache_dir, mmap=True):
+        with open(os.path.join(cache_dir, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        columns = {
+            name: np.load(os.path.join(cache_dir, f"{name}.npy"), mmap_mode="r" if mmap else None)
+            for name in COLUMNS
+        }
+        return cls(columns, meta["devices"], meta["apps"])
+
+
+def _JsonFiles(data_dir):
+    if not os.path.isdir(data_dir):
+        raise FileNotFoundError(f"Snapshot directory not found: {data_dir}")
+    return sorted(glob.glob(os.path.join(data_dir, "*.json")))
+
+
+def _SourcesStamp(files):
+    return {"count": len(files), "mtime": max((os.path.getmtime(p) for p in files), default=0)}
+
+
+def _IterSnapshots(files):
+    for path in files:
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Skipping {path}: {e}")
+            continue
+        # SaveData and FleetCollector both write one snapshot per file
+        if isinstance(data, dict) and "TimeStamp" in data:
+            yield data
+
+
+def LoadHistory(data_dir, cache_dir=None, rebuild=False):
+    """
+    Load snapshot history from the SaveData directory. With a cache_dir the columns are written as .npy
+    files once and memory-mapped afterwards, until new JSON files show up in data_dir
+    """
+    if cache_dir is None:
+        return SnapshotHistory.FromDirectory(data_dir)
+
+    files = _JsonFiles(data_dir)
+    stamp = _SourcesStamp(files)
+    meta_path = os.path.join(cache_dir, "meta.json")
+    if not rebuild and os.path.exists(meta_path):
+        with open(meta_path, encoding="utf-8") as f:
+            if json.load(f).get("sources") == stamp:
+                return SnapshotHistory.Load(cache_dir)
+
+    history = SnapshotHistory.FromSnapshots(_IterSnapshots(files))
+    history.Save(cache_dir, sources=stamp)
+    return SnapshotHistory.Load(cache_dir)
+
+
+def _Intervals(history, max_gap):
+    """
+    Indices of consecutive snapshot pairs from the same device that are at most max_gap seconds apart
+    """
+    device, ts = history["device"], history["timestamp"]
+    dt = np.diff(ts)
+    valid = (device[1:] == device[:-1]) & (dt > 0) & (dt <= max_gap)
+    start = np.flatnonzero(valid)
+    return start, dt[start]
+
+
+def BatteryDrainRate(history, max_gap=6 * 3600):
+    """
+    Average battery drain per device in percent per hour, over intervals spent discharging
+    """
+    n_dev = len(history.devices)
+    start, dt = _Intervals(history, max_gap)
+    level = history["battery_level"]
+    drop = level[start] - level[start + 1]
+    # A rise while "discharging" means the device was charged between snapshots
+    keep = ~history["charging"][start] & np.isfinite(drop) & (drop >= 0)
+    start, dt, drop = start[keep], dt[keep], drop[keep]
+
+    dev = history["device"][start]
+    total_drop = np.bincount(dev, weights=drop, minlength=n_dev)
+    total_hours = np.bincount(dev, weights=dt, minlength=n_dev) / 3600.0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        per_device = total_drop / total_hours
+    fleet = total_drop.sum() / total_hours.sum() if total_hours.sum() else np.nan
+    return per_device, fleet
+
+
+def _DeviceSlices(history):
+    if not len(history):
+        return []
+    bounds = np.flatnonzero(np.diff(history["device"])) + 1
+    starts = np.concatenate(([0], bounds))
+    ends = np.concatenate((bounds, [len(history)]))
+    return zip(history["device"][starts], starts, ends)
+
+
+def _Distribution(values):
+    values = values[np.isfinite(values)]
+    if not len(values):
+        return {"count": 0}
+    p10, p50, p90 = np.percentile(values, [10, 50, 90])
+    return {
+        "count": int(len(values)),
+        "mean": float(values.mean()),
+        "p10": float(p10),
+        "median": float(p50),
+        "p90": float(p90)
+    }
+
+
+def RssiDistribution(history):
+    rssi = np.asarray(history["rssi"])
+    per_device = {int(d): _Distribution(rssi[s:e]) for d, s, e in _DeviceSlices(history)}
+    fleet = _Distribution(rssi)
+    counts, _ = np.histogram(rssi[np.isfinite(rssi)], bins=RSSI_BINS)
+    fleet["histogram"] = {f"{lo}..{hi}": int(c) for lo, hi, c in zip(RSSI_BINS[:-1], RSSI_BINS[1:], counts)}
+    return per_device, fleet
+
+
+def StorageGrowth(history):
+    """
+    Least-squares slope of used storage per device, in bytes per day
+    """
+    n_dev = len(history.devices)
+    used = np.asarray(history["storage_used"])
+    ok = np.isfinite(used)
+    dev, t, y = history["device"][ok], history["timestamp"][ok], used[ok]
+
+    n = np.bincount(dev, minlength=n_dev)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t_mean = np.bincount(dev, weights=t, minlength=n_dev) / n
+        y_mean = np.bincount(dev, weights=y, minlength=n_dev) / n
+        # Centre per device so epoch-sized timestamps do not swamp the products
+        tc, yc = t - t_mean[dev], y - y_mean[dev]
+        slope = np.bincount(dev, weights=tc * yc, minlength=n_dev) / np.bincount(dev, weights=tc * tc, minlength=n_dev)
+    return slope * 86400.0
+
+
+def ForegroundTimeShare(history, max_gap=6 * 3600):
+    """
+    Seconds each device spent in each foreground app, attributing every interval to the app seen at its start
+    """
+    n_dev, n_app = len(history.devices), len(history.apps)
+    start, dt = _Intervals(history, max_gap)
+    app = history["foreground_app"][start]
+    keep = app >= 0
+    dev, app, dt = history["device"][start][keep], app[keep], dt[keep]
+    seconds = np.bincount(dev * n_app + app, weights=dt, minlength=n_dev * n_app)
+    return seconds.reshape(n_dev, n_app)
+
+
+def _TopShares(seconds, apps, top):
+    total = seconds.sum()
+    if not total:
+        return []
+    order = np.argsort(seconds)[::-1][:top]
+    return [
+        {"package": apps[i], "hours": round(float(seconds[i]) / 3600, 2), "share": round(float(seconds[i] / total), 4)}
+        for i in order if seconds[i] > 0
+    ]
+
+
+def _Round(value, digits=3):
+    value = float(value)
+    return None if np.isnan(value) else round(value, digits)
+
+
+def Summarize(history, max_gap=6 * 3600, top=5):
+    drain, fleet_drain = BatteryDrainRate(history, max_gap)
+    rssi, fleet_rssi = RssiDistribution(history)
+    growth = StorageGrowth(history)
+    fg = ForegroundTimeShare(history, max_gap)
+    snapshots = np.bincount(history["device"], minlength=len(history.devices))
+
+    devices = {}
+    for code, name in enumerate(history.devices):
+        devices[name] = {
+            "snapshots": int(snapshots[code]),
+            "battery_drain_pct_per_hour": _Round(drain[code]),
+            "rssi": rssi.get(code, {"count": 0}),
+            "storage_growth_bytes_per_day": _Round(growth[code], 0),
+            "foreground_apps": _TopShares(fg[code], history.apps, top)
+        }
+
+    return {
+        "devices": devices,
+        "fleet": {
+            "devices": len(history.devices),
+            "snapshots": len(history),
+            "battery_drain_pct_per_hour": _Round(fleet_drain),
+            "rssi": fleet_rssi,
+            "storage_growth_bytes_per_day": _Round(np.nansum(growth), 0),
+            "foreground_apps": _TopShares(fg.sum(axis=0), history.apps, top)
+        }
+    }
+
+
+def _PrintSummary(summary):
+    for name, stats in summary["devices"].items():
+        print(f"📱 {name} ({stats['snapshots']} snapshots)")
+        print(f"   Battery drain : {stats['battery_drain_pct_per_hour']} %/h")
+        print(f"   RSSI median   : {stats['rssi'].get('median')} dBm")
+        print(f"   Storage growth: {stats['storage_growth_bytes_per_day']} B/day")
+        for app in stats["foreground_apps"]:
+            print(f"   {app['share'] * 100:5.1f}%  {app['package']}")
+
+    fleet = summary["fleet"]
+    print(f"🌐 Fleet: {fleet['devices']} devices, {fleet['snapshots']} snapshots")
+    print(f"   Battery drain : {fleet['battery_drain_pct_per_hour']} %/h")
+    print(f"   RSSI median   : {fleet['rssi'].get('median')} dBm")
+    print(f"   Storage growth: {fleet['storage_growth_bytes_per_day']} B/day")
+    for app in fleet["foreground_apps"]:
+        print(f"   {app['share'] * 100:5.1f}%  {app['package']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-device and fleet-wide summaries of stored snapshots")
+    parser.add_argument("data_dir", nargs="?", default=DATA_DIR,
+                        help="directory of snapshot JSON files written by SaveData")
+    parser.add_argument("--cache", help="directory for memory-mapped column cache")
+    parser.add_argument("--rebuild", action="store_true", help="rebuild the column cache even if it is current")
+    parser.add_argument("--max-gap", type=float, default=6.0,
+                        help="ignore intervals between snapshots longer than this many hours")
+    parser.add_argument("--top", type=int, default=5, help="foreground apps to list per device")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args()
+
+    try:
+        history = LoadHistory(args.data_dir, args.cache, args.rebuild)
+    except FileNotFoundError as e:
+        parser.error(str(e))
+    summary = Summarize(history, max_gap=args.max_gap * 3600, top=args.top)
+    if args.json:
+        print(json.dumps(summary, indent=4, ensure_ascii=False))
+    else:
+        _PrintSummary(summary)
+
+
+if __name__ == "__main__":
+    main()
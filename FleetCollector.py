@@ -0,0 +1,79 @@
+import multiprocessing, os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+
+from ppadb.client import Client as AdbClient
+
+from DataExtractor import PhoneDataCollector, SaveData
+import Parsers
+
+
+class FleetCollector:
+    """
+    Collect snapshots from every connected device. ADB I/O runs in a thread per device while
+    parsing is shipped to a process pool, so the I/O threads never wait on the GIL for regex work
+    """
+
+    def __init__(self, host="127.0.0.1", port=5037, io_workers=None, parse_workers=None, devices=None):
+        if devices is None:
+            PhoneDataCollector.ensure_adb_server()
+            self.client = AdbClient(host, port)
+            devices = self.client.devices()
+        else:
+            self.client = None
+        self.devices = devices
+        if not self.devices:
+            raise RuntimeError("No device connected. Enable USB Debugging and connect a device!")
+
+        self.collectors = [PhoneDataCollector(device=device) for device in self.devices]
+        self.io_pool = ThreadPoolExecutor(max_workers=io_workers or len(self.collectors))
+        # Workers start on the first submit, while other I/O threads are still inside device.shell;
+        # forking a multi-threaded process can deadlock, so never use the "fork" start method here
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        self.parse_pool = ProcessPoolExecutor(max_workers=parse_workers or os.cpu_count(), mp_context=context)
+
+    def CollectFleetSnapshot(self):
+        """
+        Returns {serial: snapshot}; a device that fails is reported as {"error": ...}
+        """
+        raw_futures = {self.io_pool.submit(c.CollectRaw): c.target.serial for c in self.collectors}
+        parse_futures = {}
+        results = {}
+
+        # Raw output is pickled to the workers over the executor's pipes as soon as each device finishes
+        for future in as_completed(raw_futures):
+            serial = raw_futures[future]
+            try:
+                parse_futures[self.parse_pool.submit(Parsers.ParseSnapshot, future.result())] = serial
+            except Exception as e:
+                results[serial] = {"error": str(e)}
+
+        for future in as_completed(parse_futures):
+            serial = parse_futures[future]
+            try:
+                results[serial] = future.result()
+            except Exception as e:
+                results[serial] = {"error": str(e)}
+
+        return results
+
+    def close(self):
+        self.io_pool.shutdown()
+        self.parse_pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    saver = SaveData()
+    with FleetCollector() as fleet:
+        for serial, snapshot in fleet.CollectFleetSnapshot().items():
+            saver.SaveAsJson(snapshot, f"phone_data_{serial}")
+
+
+if __name__ == "__main__":
+    main()
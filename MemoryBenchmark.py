@@ -0,0 +1,85 @@
+import argparse, gc, json, os, tracemalloc
+
+import Parsers
+from SnapshotRecords import SnapshotRecord
+
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tests", "fixtures")
+
+
+def _Fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def SampleSnapshot():
+    """
+    One snapshot parsed from the recorded device output in tests/fixtures, with a background media session
+    """
+    commands = json.loads(_Fixture("snapshot_raw.json"))["commands"]
+    commands["dumpsys media_session"] = _Fixture("media_session.txt")
+    raw = {key: commands[cmd] for key, cmd in Parsers.SNAPSHOT_COMMANDS.items()}
+    raw["serial"] = "BENCH0001"
+    raw["power"] = commands["dumpsys power"]
+    raw["location"] = {
+        "perm": commands["dumpsys package com.android.providers.location"],
+        "mode": commands["settings get secure location_mode"],
+        "error": None,
+        "outputs": [("dumpsys location", commands["dumpsys location"], None)],
+        "props": None,
+        "providers": None,
+        "fallback_error": None,
+        "broadcasts": None
+    }
+    return Parsers.ParseSnapshot(raw)
+
+
+def _Sample(sample_json, i):
+    # Parse the JSON per copy so every copy owns its strings, as a loaded history would
+    data = json.loads(sample_json)
+    data["TimeStamp"] = f"2025-08-22 {i // 3600 % 24:02d}:{i // 60 % 60:02d}:{i % 60:02d}"
+    data["Battery"]["level"] = str(100 - i % 100)
+    data["Network"]["wifi_rssi"] = str(-40 - i % 50)
+    return data
+
+
+def _Measure(build):
+    gc.collect()
+    tracemalloc.start()
+    items = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return items, current
+
+
+def RunBenchmark(count=10000):
+    sample_json = json.dumps(SampleSnapshot())
+    dicts, dict_bytes = _Measure(lambda: [_Sample(sample_json, i) for i in range(count)])
+    del dicts
+    records, record_bytes = _Measure(lambda: [SnapshotRecord.FromSnapshot(_Sample(sample_json, i)) for i in range(count)])
+    del records
+
+    return {
+        "snapshots": count,
+        "dict_bytes": dict_bytes,
+        "record_bytes": record_bytes,
+        "dict_bytes_per_snapshot": dict_bytes // count,
+        "record_bytes_per_snapshot": record_bytes // count,
+        "ratio": round(dict_bytes / record_bytes, 2) if record_bytes else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare memory of dict snapshots against typed records")
+    parser.add_argument("-n", "--count", type=int, default=10000, help="number of snapshots to hold in memory")
+    args = parser.parse_args()
+
+    result = RunBenchmark(args.count)
+    print(f"Snapshots held      : {result['snapshots']}")
+    print(f"Dict form           : {result['dict_bytes'] / 1024 ** 2:.1f} MiB ({result['dict_bytes_per_snapshot']} B/snapshot)")
+    print(f"Typed records       : {result['record_bytes'] / 1024 ** 2:.1f} MiB ({result['record_bytes_per_snapshot']} B/snapshot)")
+    print(f"Reduction           : {result['ratio']}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+class NotificationTracker:
+    """
+    Remembers the notifications and media sessions seen on the previous poll, keyed by their stable ids
+    from Parsers.ParseNotificationRecords / Parsers.ParseMediaSessions, and reports only the differences
+    """
+
+    # Position moves on every poll while playing, so it is not treated as a state change
+    MEDIA_STATE_FIELDS = ("state", "title", "artist", "album")
+
+    def __init__(self):
+        self.notifications = {}
+        self.media = {}
+
+    def Update(self, notifications, sessions):
+        current_notifs = {n["id"]: n for n in notifications}
+        current_media = {s["id"]: s for s in sessions}
+
+        changes = {
+            "notifications_added": [n for i, n in current_notifs.items() if i not in self.notifications],
+            "notifications_removed": [n for i, n in self.notifications.items() if i not in current_notifs],
+            "media_added": [s for i, s in current_media.items() if i not in self.media],
+            "media_removed": [s for i, s in self.media.items() if i not in current_media],
+            "media_changed": []
+        }
+        for i, session in current_media.items():
+            previous = self.media.get(i)
+            if previous is None:
+                continue
+            changed = {f: session.get(f) for f in self.MEDIA_STATE_FIELDS if session.get(f) != previous.get(f)}
+            if changed:
+                changes["media_changed"].append({"id": i, "package": session["package"], "changed": changed})
+
+        self.notifications = current_notifs
+        self.media = current_media
+        return changes
@@ -0,0 +1,548 @@
+import re
+
+
+BATTERY_STATUS_MAP = {
+    "1": "Unknown",
+    "2": "Charging",
+    "3": "Discharging",
+    "4": "Not charging",
+    "5": "Full"
+}
+BATTERY_HEALTH_MAP = {
+    "1": "Unknown",
+    "2": "Good",
+    "3": "Overheat",
+    "4": "Dead",
+    "5": "Overvoltage",
+    "6": "Failure",
+    "7": "Cold"
+}
+
+# CollectRaw key -> shell command; power and location are fetched conditionally and are not listed
+SNAPSHOT_COMMANDS = {
+    "timestamp": "date '+%Y-%m-%d %H:%M:%S'",
+    "model": "getprop ro.product.model",
+    "version": "getprop ro.build.version.release",
+    "wm_size": "wm size",
+    "wm_density": "wm density",
+    "battery": "dumpsys battery",
+    "window": "dumpsys window",
+    "wifi": "dumpsys wifi",
+    "ip": "ip addr show wlan0 || ip addr show wifi0",
+    "sim": "getprop gsm.operator.alpha",
+    "df": "df -h /data",
+    "activities": "dumpsys activity activities",
+    "recents": "dumpsys activity recents",
+    "media_session": "dumpsys media_session",
+    "telecom": "dumpsys telecom",
+    "notification": "dumpsys notification --noredact"
+}
+
+LOCATION_COMMANDS = [
+    "dumpsys location",
+    "dumpsys location_manager",
+    "dumpsys locationpolicy",
+    "dumpsys gps"
+]
+
+_LOCATION_FLAGS = re.IGNORECASE | re.DOTALL
+LOCATION_PATTERNS = [
+    # Fused location (Google Play Services)
+    (re.compile(r"fused.*?Location\[([0-9.\-]+),([0-9.\-]+)", _LOCATION_FLAGS), "fused"),
+    (re.compile(r"fused.*?lat[=/:]([0-9.\-]+).*?lng[=/:]([0-9.\-]+)", _LOCATION_FLAGS), "fused"),
+
+    # GPS provider
+    (re.compile(r"gps.*?Location\[([0-9.\-]+),([0-9.\-]+)", _LOCATION_FLAGS), "gps"),
+    (re.compile(r"gps.*?lat[=/:]([0-9.\-]+).*?lng[=/:]([0-9.\-]+)", _LOCATION_FLAGS), "gps"),
+
+    # Network provider
+    (re.compile(r"network.*?Location\[([0-9.\-]+),([0-9.\-]+)", _LOCATION_FLAGS), "network"),
+    (re.compile(r"network.*?lat[=/:]([0-9.\-]+).*?lng[=/:]([0-9.\-]+)", _LOCATION_FLAGS), "network"),
+
+    # Last known location
+    (re.compile(r"last.*?known.*?Location\[([0-9.\-]+),([0-9.\-]+)", _LOCATION_FLAGS), "last_known"),
+    (re.compile(r"last.*?lat[=/:]([0-9.\-]+).*?lng[=/:]([0-9.\-]+)", _LOCATION_FLAGS), "last_known"),
+
+    # Generic patterns
+    (re.compile(r"Location\[([0-9.\-]+),([0-9.\-]+)", _LOCATION_FLAGS), "generic"),
+    (re.compile(r"lat[=/:]([0-9.\-]+).*?lng[=/:]([0-9.\-]+)", _LOCATION_FLAGS), "generic"),
+    (re.compile(r"latitude[=/:]([0-9.\-]+).*?longitude[=/:]([0-9.\-]+)", _LOCATION_FLAGS), "generic"),
+
+    # Coordinate patterns
+    (re.compile(r"coordinates.*?([0-9.\-]+),([0-9.\-]+)", _LOCATION_FLAGS), "coordinates"),
+    (re.compile(r"position.*?([0-9.\-]+),([0-9.\-]+)", _LOCATION_FLAGS), "position")
+]
+_ACCURACY_RE = re.compile(r"acc[uracy]*[=/:]([0-9.]+)", re.IGNORECASE)
+_TIME_PATTERNS = [
+    re.compile(r"time[=/:]([0-9]{10,13})", re.IGNORECASE),
+    re.compile(r"timestamp[=/:]([0-9]{10,13})", re.IGNORECASE),
+    re.compile(r"age[=/:]([0-9]+)", re.IGNORECASE)
+]
+
+_NOTIF_FIELD_RE = re.compile(
+    r"\b(pkg|id|tag|key|postTime|mCreationTimeMs|channel|category)=([^\s,)]+)|mChannel=NotificationChannel\{mId='([^']*)'"
+)
+_LOCKSCREEN_RE = re.compile(r"m(?:Dreaming|Showing)Lockscreen=(true|false)")
+_PHONE_RE = re.compile(r"handle \(PHONE\): tel:(\+?\d+)")
+
+# One alternation over the whole media_session dump: each session starts at its "pkg/tag (userId=N)" header
+# or, on dumps without one, at a second package= line. The same "pkg/tag (userId=N)" text also follows
+# "Media button session is" and "Global priority session is"; those lines are not sessions
+_MEDIA_FIELD_RE = re.compile(
+    r"(?<!session is )(?<![\w.])(?P<header>[\w.]+)/(?P<tag>\S+) \(userId=(?P<user>\d+)\)"
+    r"|package=(?P<package>[\w.]+)"
+    r"|state=PlaybackState \{state=(?:(?P<state_name>[A-Z_]+)\()?(?P<state>\d+)"
+    r"|position=(?P<position>\d+)"
+    r"|speed=(?P<speed>[0-9.]+)"
+    r"|metadata:.*?description=(?P<description>.*)"
+)
+MEDIA_STATE_MAP = {"1": "STOPPED", "2": "PAUSED", "3": "PLAYING"}
+
+
+def ParseDeviceProperties(model, version, wm_size, wm_density):
+    return {
+        "Model": model.strip(),
+        "Version": version.strip(),
+        "Resolution": wm_size.strip(),
+        "DPI": wm_density.strip()
+    }
+
+
+def ParseBatteryInfo(raw):
+    info = {}
+    for line in raw.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if ":" in line:
+            key, value = line.split(":", 1)
+            key = key.strip()
+            value = value.strip() if value.strip() else None
+            info[key] = value
+        else:
+            info[line.strip()] = None
+
+    if "status" in info:
+        info["status"] = BATTERY_STATUS_MAP.get(info["status"], info["status"])
+    if "health" in info:
+        info["health"] = BATTERY_HEALTH_MAP.get(info["health"], info["health"])
+
+    return info
+
+
+def ParseNetworkConnectivityInfo(wifi_raw, ip_output, sim_info):
+    wifi_ssid, wifi_rssi = None, None
+
+    for line in wifi_raw.splitlines():
+        if "SSID:" in line and not wifi_ssid:
+            wifi_ssid = line.split("SSID:")[-1].strip().strip('"')
+        if "RSSI:" in line and not wifi_rssi:
+            wifi_rssi = line.split("RSSI:")[-1].strip()
+
+    ip_addr = None
+    for line in ip_output.splitlines():
+        if "inet " in line:
+            ip_addr = line.strip().split()[1]
+            break
+
+    sim_info = sim_info.strip()
+
+    return {
+        "wifi_ssid": wifi_ssid or "Unknown",
+        "wifi_rssi": wifi_rssi or "Unknown",
+        "ip_addr": ip_addr or "Not Connected",
+        "sim_carrier": sim_info or "No SIM"
+    }
+
+
+def ParseCallState(raw):
+    call = {"state": "IDLE", "number": None, "contact": None}
+
+    if "ACTIVE" in raw:
+        call["state"] = "ACTIVE"
+    elif "DIALING" in raw:
+        call["state"] = "DIALING"
+    elif "RINGING" in raw:
+        call["state"] = "RINGING"
+    elif "DISCONNECTED" in raw:
+        call["state"] = "DISCONNECTED"
+
+    m_num = _PHONE_RE.search(raw)
+    if m_num:
+        call["number"] = m_num.group(1)
+
+    return call
+
+
+def ParseNotificationRecords(raw):
+    """
+    Single pass over `dumpsys notification --noredact`, one record per NotificationRecord block.
+    The id is the system notification key, which stays the same while the notification is posted
+    """
+    blocks = []
+    current, indent = None, -1
+
+    for line in raw.splitlines():
+        stripped = line.lstrip()
+        depth = len(line) - len(stripped)
+
+        if stripped.startswith("NotificationRecord("):
+            current, indent = {}, depth
+            blocks.append(current)
+        elif current is None or depth <= indent:
+            current = None
+            continue
+
+        for m in _NOTIF_FIELD_RE.finditer(stripped):
+            name, value = (m.group(1), m.group(2).rstrip(":")) if m.group(1) else ("channel", m.group(3))
+            if value and value != "null":
+                current.setdefault(name, value)
+
+    records = {}
+    for block in blocks:
+        package = block.get("pkg")
+        if not package:
+            continue
+        key = block.get("key")
+        post_time = block.get("postTime") or block.get("mCreationTimeMs")
+        record_id = key or f"{package}|{block.get('id')}|{block.get('tag')}"
+        # The same notification is listed again under the enqueued section; keep the first
+        records.setdefault(record_id, {
+            "id": record_id,
+            "package": package,
+            "key": key,
+            "post_time": int(post_time) if post_time and post_time.isdigit() else None,
+            "channel": block.get("channel"),
+            "category": block.get("category")
+        })
+
+    return list(records.values())
+
+
+def ParseNotifications(raw):
+    records = ParseNotificationRecords(raw)
+    packages = list(dict.fromkeys(r["package"] for r in records if not r["package"].startswith('android.')))
+
+    return {
+        "active_notifications": packages,
+        "total_count": len(packages),
+        "notifications": records
+    }
+
+
+def FindLocationFix(output):
+    """
+    Return (fix, parse_errors) for one location command's output. fix is the first match of
+    LOCATION_PATTERNS inside valid, non-zero coordinate ranges, or None. The I/O layer uses this
+    to decide when to stop running location commands, so the decision always agrees with ParseLocation
+    """
+    errors = []
+    if not (output and len(output) > 50):
+        return None, errors
+
+    for pattern, provider_type in LOCATION_PATTERNS:
+        for match in pattern.finditer(output):
+            try:
+                lat = float(match.group(1))
+                lon = float(match.group(2))
+            except (ValueError, IndexError) as e:
+                errors.append(f"Parse error in {provider_type}: {str(e)}")
+                continue
+
+            if -90 <= lat <= 90 and -180 <= lon <= 180 and (abs(lat) > 0.001 or abs(lon) > 0.001):
+                fix = {"lat": lat, "lon": lon, "provider": provider_type, "accuracy": None, "timestamp": None}
+
+                section_start = max(0, match.start() - 200)
+                section_end = min(len(output), match.end() + 200)
+                section = output[section_start:section_end]
+
+                acc_match = _ACCURACY_RE.search(section)
+                if acc_match:
+                    fix["accuracy"] = float(acc_match.group(1))
+
+                for time_pattern in _TIME_PATTERNS:
+                    time_match = time_pattern.search(section)
+                    if time_match:
+                        fix["timestamp"] = int(time_match.group(1))
+                        break
+
+                return fix, errors
+
+    return None, errors
+
+
+def ParseLocation(raw):
+    """
+    Parse the outputs gathered by PhoneDataCollector.FetchLocationRaw into a location dict
+    """
+    loc = {
+        "lat": None,
+        "lon": None,
+        "provider": None,
+        "accuracy": None,
+        "timestamp": None,
+        "status": "Checking location...",
+        "permission_status": "Unknown",
+        "debug_info": []
+    }
+
+    perm_output = raw.get("perm")
+    if perm_output is not None:
+        if "android.permission.ACCESS_FINE_LOCATION: granted=true" in perm_output or \
+        "android.permission.ACCESS_COARSE_LOCATION: granted=true" in perm_output:
+            loc["permission_status"] = "System location permission granted"
+        else:
+            loc["permission_status"] = "System location permission unclear"
+
+    location_mode = raw.get("mode")
+    if location_mode is not None:
+        location_mode = location_mode.strip()
+        if location_mode not in ["1", "2", "3"]:
+            loc["status"] = "Location services may be disabled"
+        loc["debug_info"].append(f"Location mode: {location_mode}")
+    if raw.get("error"):
+        loc["debug_info"].append(f"Permission check error: {raw['error']}")
+
+    for cmd, output, error in raw.get("outputs", []):
+        if error is not None:
+            loc["debug_info"].append(f"Error with {cmd}: {error}")
+            continue
+        if not (output and len(output) > 50):
+            loc["debug_info"].append(f"Tried {cmd}: No substantial output")
+            continue
+
+        loc["debug_info"].append(f"Tried {cmd}: Got {len(output)} chars")
+        fix, errors = FindLocationFix(output)
+        loc["debug_info"].extend(errors)
+        if fix:
+            loc.update(fix)
+            loc["status"] = f"Location found via {cmd}"
+            return loc
+
+    if raw.get("fallback_error"):
+        loc["debug_info"].append(f"Properties check error: {raw['fallback_error']}")
+    else:
+        if raw.get("props"):
+            loc["debug_info"].append(f"Location props: {len(raw['props'])} chars")
+        providers = (raw.get("providers") or "").strip()
+        if providers and providers != "null":
+            loc["debug_info"].append(f"Allowed providers: {providers}")
+
+    if raw.get("broadcasts"):
+        loc["debug_info"].append("Found location-related broadcasts")
+
+    if "0" in loc.get("debug_info", []):
+        loc["status"] = "Location services are disabled on device"
+    elif loc["permission_status"] == "System location permission unclear":
+        loc["status"] = "Location permission may be denied or location services disabled"
+    else:
+        loc["status"] = "No location data available despite permissions"
+
+    return loc
+
+
+def ParseMediaSessions(raw_media):
+    """
+    Single pass over `dumpsys media_session`. The id combines user, package and session tag;
+    a session listed more than once (e.g. under several users' records) is merged into one entry
+    """
+    sessions = []
+    by_id = {}
+    info, package_line = None, False
+
+    for m in _MEDIA_FIELD_RE.finditer(raw_media):
+        field = m.lastgroup
+        if field == "user":
+            session_id = f"{m.group('user')}|{m.group('header')}|{m.group('tag')}"
+            info = by_id.get(session_id)
+            if info is None:
+                info = by_id[session_id] = {"id": session_id, "package": m.group("header")}
+                sessions.append(info)
+            package_line = False
+        elif field == "package":
+            if info is None or package_line:
+                info = {"id": None}
+                sessions.append(info)
+            info["package"] = m.group("package")
+            package_line = True
+        elif info is None or field in info:
+            continue
+        elif field == "state":
+            code = m.group("state")
+            info["state"] = m.group("state_name") or MEDIA_STATE_MAP.get(code, f"STATE_{code}")
+        elif field == "position":
+            info["position"] = int(m.group("position"))
+        elif field == "speed":
+            info["speed"] = float(m.group("speed"))
+        elif field == "description":
+            info["description"] = [p.strip() for p in m.group("description").strip().split(",")]
+
+    result = []
+    counts = {}
+    for info in sessions:
+        package = info.get("package")
+        if not package:
+            continue
+        parts = [None if p == "null" else p for p in info.get("description") or []]
+        counts[package] = counts.get(package, 0) + 1
+        result.append({
+            "id": info["id"] or f"{package}|{counts[package]}",
+            "package": package,
+            "state": info.get("state", "UNKNOWN"),
+            "position": info.get("position"),
+            "speed": info.get("speed"),
+            "title": parts[0] if parts else None,
+            "artist": parts[1] if len(parts) > 1 else None,
+            "album": ", ".join(p for p in parts[2:] if p) or None
+        })
+
+    return result
+
+
+def ParseForegroundAppDetailed(act_dump, raw_media):
+    app_info = {"package": None, "activity": None, "inferred_state": "Unknown"}
+
+    resumed_line = None
+    for line in act_dump.splitlines():
+        if "mResumedActivity" in line or "mResumedActivities" in line:
+            resumed_line = line.strip()
+            break
+        if "topResumedActivity" in line.lower():
+            resumed_line = line.strip()
+            break
+
+    if resumed_line:
+        for token in resumed_line.split():
+            if '/' in token:
+                try:
+                    pkg, activity = token.split('/', 1)
+                except ValueError:
+                    continue
+                pkg = pkg.strip()
+                activity = activity.strip().strip('}').strip(',')
+                app_info["package"] = pkg
+                app_info["activity"] = activity
+                act_lower = activity.lower()
+                if any(x in act_lower for x in ("watch", "video", "player", "playback")):
+                    app_info["inferred_state"] = "Watching Video"
+                elif any(x in act_lower for x in ("music", "audio", "nowplaying", "player")):
+                    app_info["inferred_state"] = "Listening to Music"
+                elif any(x in act_lower for x in ("chat", "conversation", "message")):
+                    app_info["inferred_state"] = "Chatting"
+                elif any(x in act_lower for x in ("home", "shell", "launcher")):
+                    app_info["inferred_state"] = "Browsing/Home Screen"
+                else:
+                    app_info["inferred_state"] = "Using App"
+                break
+
+    sessions = ParseMediaSessions(raw_media)
+
+    fg_pkg = app_info.get("package")
+    fg_session = None
+    background_sessions = []
+    for s in sessions:
+        pkg = s.get("package")
+        if not pkg:
+            continue
+        if fg_pkg and (pkg == fg_pkg or pkg.startswith(fg_pkg + ":")):
+            if fg_session is None:
+                fg_session = s
+            else:
+                if fg_session.get("state") != "PLAYING" and s.get("state") == "PLAYING":
+                    fg_session = s
+        else:
+            background_sessions.append(s)
+
+    if fg_session:
+        if fg_session.get("state") == "PLAYING":
+            if app_info["inferred_state"] in ("Browsing/Home Screen", "Using App"):
+                app_info["inferred_state"] = "Playing (foreground app)"
+            else:
+                app_info["inferred_state"] = f"{app_info['inferred_state']} (playing)"
+        app_info["media_session"] = fg_session
+
+    playing_bg = [s for s in background_sessions if s.get("state") == "PLAYING"]
+    if playing_bg:
+        app_info["background_media"] = [
+            {"id": s.get("id"), "package": s.get("package"), "state": s.get("state"),
+            "title": s.get("title"), "artist": s.get("artist"), "position": s.get("position")}
+            for s in playing_bg
+        ]
+
+    return app_info
+
+
+def ParseStorageInfo(raw):
+    parts = raw.splitlines()
+    if len(parts) > 1:
+        cols = parts[1].split()
+        return {"Total": cols[1], "Used": cols[2], "Available": cols[3], "Usage": cols[4]}
+    return {}
+
+
+def HasLockscreenState(window_output):
+    """
+    True when `dumpsys window` alone decides the screen state, so `dumpsys power` need not be fetched
+    """
+    return _LOCKSCREEN_RE.search(window_output) is not None
+
+
+def ParseScreenState(window_output, power_output=None):
+    state = "Unknown"
+
+    flags = _LOCKSCREEN_RE.findall(window_output)
+    if flags:
+        state = "Locked" if "true" in flags else "Unlocked"
+
+    if state == "Unknown" and power_output is not None:
+        if "mHoldingDisplaySuspendBlocker=true" in power_output or "mWakefulness=Awake" in power_output:
+            state = "Unlocked"
+        else:
+            state = "Locked"
+
+    return state
+
+
+def ParseUserRunningApps(activities_output, recents_output):
+    user_apps = set()
+    for line in activities_output.splitlines():
+        line = line.strip()
+        if "Hist" in line or "mResumedActivity" in line:
+            parts = line.split()
+            for part in parts:
+                if "/" in part and "." in part:
+                    pkg = part.split("/")[0]
+                    user_apps.add(pkg)
+
+    for line in recents_output.splitlines():
+        line = line.strip()
+        if "Recent #".lower() in line.lower():
+            if "A=" in line:
+                pkg = line.split("A=")[1].split()[0]
+                user_apps.add(pkg)
+
+    return list(user_apps)
+
+
+def ParseSnapshot(raw):
+    """
+    Build a full snapshot dict from PhoneDataCollector.CollectRaw output. Pure, so it can run in a worker process
+    """
+    foreground = ParseForegroundAppDetailed(raw["activities"], raw["media_session"])
+    return {
+        "TimeStamp" : raw["timestamp"].strip(),
+        "Serial" : raw.get("serial"),
+        "Device": ParseDeviceProperties(raw["model"], raw["version"], raw["wm_size"], raw["wm_density"]),
+        "Battery": ParseBatteryInfo(raw["battery"]),
+        "ScreenState": ParseScreenState(raw["window"], raw.get("power")),
+        "Network": ParseNetworkConnectivityInfo(raw["wifi"], raw["ip"], raw["sim"]),
+        "Storage": ParseStorageInfo(raw["df"]),
+        "Recent Apps" : ParseUserRunningApps(raw["activities"], raw["recents"]),
+        "On Screen Running App" : foreground,
+        "Trace" : {
+            "Call": ParseCallState(raw["telecom"]),
+            "Messaging": ParseNotifications(raw["notification"]),
+            "Media": foreground,
+            "Location": ParseLocation(raw["location"])
+        }
+    }
@@ -0,0 +1,410 @@
+import json, re, sys
+from dataclasses import dataclass, fields
+from typing import ClassVar, Optional
+
+
+_SIZE_UNITS = {"": 1, "B": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4, "P": 1024 ** 5}
+_INT_RE = re.compile(r"-?\d+")
+_SIZE_RE = re.compile(r"([0-9.]+)\s*([KMGTP]?)i?B?", re.IGNORECASE)
+_RESOLUTION_RE = re.compile(r"(\d+)x(\d+)")
+_UNKNOWN = ("Unknown", "Not Connected", "No SIM")
+
+
+def _Str(value):
+    if value is None:
+        return None
+    return sys.intern(str(value))
+
+
+def _Int(value):
+    if value is None:
+        return None
+    if isinstance(value, int):
+        return value
+    m = _INT_RE.search(str(value))
+    return int(m.group(0)) if m else None
+
+
+def _Float(value):
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _Bool(value):
+    if value is None:
+        return None
+    return str(value).strip().lower() == "true"
+
+
+def _Known(value):
+    if value is None or value in _UNKNOWN:
+        return None
+    return value
+
+
+def ParseSize(value):
+    """
+    Convert a `df -h` size such as "1.5G" into bytes
+    """
+    if value is None:
+        return None
+    m = _SIZE_RE.fullmatch(str(value).strip())
+    if not m:
+        return None
+    return int(float(m.group(1)) * _SIZE_UNITS[m.group(2).upper()])
+
+
+def _Dump(value):
+    if isinstance(value, _Record):
+        return value.ToDict()
+    if isinstance(value, tuple):
+        return [_Dump(v) for v in value]
+    return value
+
+
+class _Record:
+    __slots__ = ()
+    _nested = {}
+    # Fields FromSnapshot interns; FromDict interns the same ones so reloaded records stay as compact
+    _interned = ()
+
+    def ToDict(self):
+        return {f.name: _Dump(getattr(self, f.name)) for f in fields(self)}
+
+    @classmethod
+    def FromDict(cls, data):
+        kwargs = {}
+        for f in fields(cls):
+            if f.name not in data:
+                continue
+            value = data[f.name]
+            nested = cls._nested.get(f.name)
+            if isinstance(value, list):
+                value = tuple(nested.FromDict(v) if nested else v for v in value)
+            elif nested is not None and value is not None:
+                value = nested.FromDict(value)
+            if f.name in cls._interned:
+                value = tuple(_Str(v) for v in value) if isinstance(value, tuple) else _Str(value)
+            kwargs[f.name] = value
+        return cls(**kwargs)
+
+
+@dataclass(slots=True)
+class DeviceRecord(_Record):
+    _interned: ClassVar[tuple] = ("model", "version")
+
+    model: Optional[str] = None
+    version: Optional[str] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    dpi: Optional[int] = None
+
+    @classmethod
+    def FromSnapshot(cls, data):
+        width = height = None
+        m = _RESOLUTION_RE.search(data.get("Resolution") or "")
+        if m:
+            width, height = int(m.group(1)), int(m.group(2))
+        return cls(
+            model=_Str(data.get("Model")),
+            version=_Str(data.get("Version")),
+            width=width,
+            height=height,
+            dpi=_Int(data.get("DPI"))
+        )
+
+
+@dataclass(slots=True)
+class BatteryRecord(_Record):
+    _known: ClassVar[dict] = {
+        "level": ("level", _Int),
+        "scale": ("scale", _Int),
+        "status": ("status", _Str),
+        "health": ("health", _Str),
+        "present": ("present", _Bool),
+        "AC powered": ("ac_powered", _Bool),
+        "USB powered": ("usb_powered", _Bool),
+        "Wireless powered": ("wireless_powered", _Bool),
+        "voltage": ("voltage_mv", _Int),
+        "temperature": ("temperature_decic", _Int),
+        "technology": ("technology", _Str),
+        "Charge counter": ("charge_counter_uah", _Int)
+    }
+    _interned: ClassVar[tuple] = ("status", "health", "technology")
+
+    level: Optional[int] = None
+    scale: Optional[int] = None
+    status: Optional[str] = None
+    health: Optional[str] = None
+    present: Optional[bool] = None
+    ac_powered: Optional[bool] = None
+    usb_powered: Optional[bool] = None
+    wireless_powered: Optional[bool] = None
+    voltage_mv: Optional[int] = None
+    temperature_decic: Optional[int] = None
+    technology: Optional[str] = None
+    charge_counter_uah: Optional[int] = None
+    extra: Optional[dict] = None
+
+    @classmethod
+    def FromSnapshot(cls, data):
+        kwargs, extra = {}, {}
+        for key, value in data.items():
+            if key in cls._known:
+                name, convert = cls._known[key]
+                kwargs[name] = convert(value)
+            else:
+                extra[key] = value
+        return cls(extra=extra or None, **kwargs)
+
+    @property
+    def percent(self):
+        if self.level is None:
+            return None
+        return 100.0 * self.level / (self.scale or 100)
+
+
+@dataclass(slots=True)
+class NetworkRecord(_Record):
+    _interned: ClassVar[tuple] = ("wifi_ssid", "sim_carrier")
+
+    wifi_ssid: Optional[str] = None
+    wifi_rssi: Optional[int] = None
+    ip_addr: Optional[str] = None
+    sim_carrier: Optional[str] = None
+
+    @classmethod
+    def FromSnapshot(cls, data):
+        return cls(
+            wifi_ssid=_Str(_Known(data.get("wifi_ssid"))),
+            wifi_rssi=_Int(_Known(data.get("wifi_rssi"))),
+            ip_addr=_Known(data.get("ip_addr")),
+            sim_carrier=_Str(_Known(data.get("sim_carrier")))
+        )
+
+
+@dataclass(slots=True)
+class StorageRecord(_Record):
+    total_bytes: Optional[int] = None
+    used_bytes: Optional[int] = None
+    available_bytes: Optional[int] = None
+    usage_percent: Optional[int] = None
+
+    @classmethod
+    def FromSnapshot(cls, data):
+        return cls(
+            total_bytes=ParseSize(data.get("Total")),
+            used_bytes=ParseSize(data.get("Used")),
+            available_bytes=ParseSize(data.get("Available")),
+            usage_percent=_Int(data.get("Usage"))
+        )
+
+
+@dataclass(slots=True)
+class MediaSessionRecord(_Record):
+    _interned: ClassVar[tuple] = ("package", "state")
+
+    id: Optional[str] = None
+    package: Optional[str] = None
+    state: Optional[str] = None
+    position: Optional[int] = None
+    speed: Optional[float] = None
+    title: Optional[str] = None
+    artist: Optional[str] = None
+    album: Optional[str] = None
+
+    @classmethod
+    def FromSnapshot(cls, data):
+        return cls(
+            id=data.get("id"),
+            package=_Str(data.get("package")),
+            state=_Str(data.get("state")),
+            position=_Int(data.get("position")),
+            speed=_Float(data.get("speed")),
+            title=data.get("title"),
+            artist=data.get("artist"),
+            album=data.get("album")
+        )
+
+
+@dataclass(slots=True)
+class ForegroundAppRecord(_Record):
+    _nested: ClassVar[dict] = {"media_session": MediaSessionRecord, "background_media": MediaSessionRecord}
+    _interned: ClassVar[tuple] = ("package", "activity", "inferred_state")
+
+    package: Optional[str] = None
+    activity: Optional[str] = None
+    inferred_state: Optional[str] = None
+    media_session: Optional[MediaSessionRecord] = None
+    background_media: tuple = ()
+
+    @classmethod
+    def FromSnapshot(cls, data):
+        session = data.get("media_session")
+        return cls(
+            package=_Str(data.get("package")),
+            activity=_Str(data.get("activity")),
+            inferred_state=_Str(data.get("inferred_state")),
+            media_session=MediaSessionRecord.FromSnapshot(session) if session else None,
+            background_media=tuple(MediaSessionRecord.FromSnapshot(s) for s in data.get("background_media", ()))
+        )
+
+
+@dataclass(slots=True)
+class CallRecord(_Record):
+    _interned: ClassVar[tuple] = ("state",)
+
+    state: Optional[str] = None
+    number: Optional[str] = None
+    contact: Optional[str] = None
+
+    @classmethod
+    def FromSnapshot(cls, data):
+        return cls(state=_Str(data.get("state")), number=data.get("number"), contact=data.get("contact"))
+
+
+@dataclass(slots=True)
+class NotificationRecord(_Record):
+    _interned: ClassVar[tuple] = ("package", "channel", "category")
+
+    id: Optional[str] = None
+    package: Optional[str] = None
+    key: Optional[str] = None
+    post_time: Optional[int] = None
+    channel: Optional[str] = None
+    category: Optional[str] = None
+
+    @classmethod
+    def FromSnapshot(cls, data):
+        return cls(
+            id=data.get("id"),
+            package=_Str(data.get("package")),
+            key=data.get("key"),
+            post_time=_Int(data.get("post_time")),
+            channel=_Str(data.get("channel")),
+            category=_Str(data.get("category"))
+        )
+
+
+@dataclass(slots=True)
+class NotificationsRecord(_Record):
+    _nested: ClassVar[dict] = {"notifications": NotificationRecord}
+    _interned: ClassVar[tuple] = ("active_notifications",)
+
+    active_notifications: tuple = ()
+    notifications: tuple = ()
+
+    @classmethod
+    def FromSnapshot(cls, data):
+        return cls(
+            active_notifications=tuple(_Str(p) for p in data.get("active_notifications", ())),
+            notifications=tuple(NotificationRecord.FromSnapshot(n) for n in data.get("notifications", ()))
+        )
+
+    @property
+    def total_count(self):
+        return len(self.active_notifications)
+
+
+@dataclass(slots=True)
+class LocationRecord(_Record):
+    _interned: ClassVar[tuple] = ("provider", "status", "permission_status")
+
+    lat: Optional[float] = None
+    lon: Optional[float] = None
+    provider: Optional[str] = None
+    accuracy: Optional[float] = None
+    timestamp: Optional[int] = None
+    status: Optional[str] = None
+    permission_status: Optional[str] = None
+    debug_info: tuple = ()
+
+    @classmethod
+    def FromSnapshot(cls, data):
+        return cls(
+            lat=_Float(data.get("lat")),
+            lon=_Float(data.get("lon")),
+            provider=_Str(data.get("provider")),
+            accuracy=_Float(data.get("accuracy")),
+            timestamp=_Int(data.get("timestamp")),
+            status=_Str(data.get("status")),
+            permission_status=_Str(data.get("permission_status")),
+            debug_info=tuple(data.get("debug_info", ()))
+        )
+
+
+@dataclass(slots=True)
+class TraceRecord(_Record):
+    _nested: ClassVar[dict] = {
+        "call": CallRecord,
+        "messaging": NotificationsRecord,
+        "media": ForegroundAppRecord,
+        "location": LocationRecord
+    }
+
+    call: Optional[CallRecord] = None
+    messaging: Optional[NotificationsRecord] = None
+    media: Optional[ForegroundAppRecord] = None
+    location: Optional[LocationRecord] = None
+
+    @classmethod
+    def FromSnapshot(cls, data):
+        return cls(
+            call=CallRecord.FromSnapshot(data["Call"]) if "Call" in data else None,
+            messaging=NotificationsRecord.FromSnapshot(data["Messaging"]) if "Messaging" in data else None,
+            media=ForegroundAppRecord.FromSnapshot(data["Media"]) if "Media" in data else None,
+            location=LocationRecord.FromSnapshot(data["Location"]) if "Location" in data else None
+        )
+
+
+@dataclass(slots=True)
+class SnapshotRecord(_Record):
+    _nested: ClassVar[dict] = {
+        "device": DeviceRecord,
+        "battery": BatteryRecord,
+        "network": NetworkRecord,
+        "storage": StorageRecord,
+        "foreground": ForegroundAppRecord,
+        "trace": TraceRecord
+    }
+    _interned: ClassVar[tuple] = ("serial", "screen_state", "recent_apps")
+
+    timestamp: Optional[str] = None
+    serial: Optional[str] = None
+    device: Optional[DeviceRecord] = None
+    battery: Optional[BatteryRecord] = None
+    screen_state: Optional[str] = None
+    network: Optional[NetworkRecord] = None
+    storage: Optional[StorageRecord] = None
+    recent_apps: tuple = ()
+    foreground: Optional[ForegroundAppRecord] = None
+    trace: Optional[TraceRecord] = None
+
+    @classmethod
+    def FromSnapshot(cls, data):
+        """
+        Build a typed record from the dict produced by PhoneDataCollector.CollectSnapshot
+        """
+        return cls(
+            timestamp=data.get("TimeStamp"),
+            serial=_Str(data.get("Serial")),
+            device=DeviceRecord.FromSnapshot(data.get("Device", {})),
+            battery=BatteryRecord.FromSnapshot(data.get("Battery", {})),
+            screen_state=_Str(data.get("ScreenState")),
+            network=NetworkRecord.FromSnapshot(data.get("Network", {})),
+            storage=StorageRecord.FromSnapshot(data.get("Storage", {})),
+            recent_apps=tuple(_Str(p) for p in data.get("Recent Apps", ())),
+            foreground=ForegroundAppRecord.FromSnapshot(data.get("On Screen Running App", {})),
+            trace=TraceRecord.FromSnapshot(data.get("Trace", {}))
+        )
+
+    def ToJson(self, **kwargs):
+        return json.dumps(self.ToDict(), ensure_ascii=False, **kwargs)
+
+    @classmethod
+    def FromJson(cls, text):
+        return cls.FromDict(json.loads(text))
@@ -0,0 +1,50 @@
+import json, os, sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Parsers
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def LoadFixture(name):
+    path = os.path.join(FIXTURES, name)
+    with open(path, encoding="utf-8") as f:
+        return json.load(f) if name.endswith(".json") else f.read()
+
+
+class FakeDevice:
+    """
+    Stands in for a ppadb device: answers shell() from a command -> output map and records what was run
+    """
+
+    def __init__(self, commands, serial="FAKE0001"):
+        self.commands = commands
+        self.serial = serial
+        self.calls = []
+
+    def shell(self, cmd):
+        self.calls.append(cmd)
+        return self.commands.get(cmd, "")
+
+
+def RawSnapshot(commands, location_outputs=None, serial="FAKE0001"):
+    """
+    Build the dict PhoneDataCollector.CollectRaw would return for a device answering from commands
+    """
+    if location_outputs is None:
+        location_outputs = [("dumpsys location", commands["dumpsys location"], None)]
+    raw = {key: commands[cmd] for key, cmd in Parsers.SNAPSHOT_COMMANDS.items()}
+    raw["serial"] = serial
+    raw["power"] = commands["dumpsys power"]
+    raw["location"] = {
+        "perm": commands["dumpsys package com.android.providers.location"],
+        "mode": commands["settings get secure location_mode"],
+        "error": None,
+        "outputs": location_outputs,
+        "props": commands.get("getprop | grep -i location"),
+        "providers": commands.get("settings get secure location_providers_allowed"),
+        "fallback_error": None,
+        "broadcasts": commands.get("dumpsys activity broadcasts | grep -i location")
+    }
+    return raw
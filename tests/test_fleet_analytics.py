@@ -0,0 +1,80 @@
+import copy, json
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import FleetAnalytics
+import Parsers
+from conftest import LoadFixture, RawSnapshot
+
+SNAPSHOT = Parsers.ParseSnapshot(RawSnapshot(LoadFixture("snapshot_raw.json")["commands"]))
+
+
+def _Snapshot(serial, hour, level, package="com.a", used="60G"):
+    data = copy.deepcopy(SNAPSHOT)
+    data["Serial"] = serial
+    data["TimeStamp"] = f"2025-08-22 {hour:02d}:00:00"
+    data["Battery"]["status"] = "Discharging"
+    data["Battery"]["level"] = str(level)
+    data["On Screen Running App"]["package"] = package
+    data["Storage"]["Used"] = used
+    return data
+
+
+def test_snapshots_without_serial_are_skipped(capsys):
+    snapshots = [_Snapshot("A", h, 100 - 2 * h) for h in range(4)]
+    # Same model, no serial: must not be merged into device A or into each other
+    snapshots += [_Snapshot(None, h, 50 + h) for h in range(4)]
+    history = FleetAnalytics.SnapshotHistory.FromSnapshots(snapshots)
+
+    assert history.devices == ["A"]
+    assert len(history) == 4
+    assert "Skipped 4 snapshots" in capsys.readouterr().out
+
+
+def test_summary_per_device():
+    snapshots = [_Snapshot("A", h, 100 - 2 * h, package=["com.a", "com.b"][h % 2], used=f"{60 + h}G") for h in range(5)]
+    snapshots += [_Snapshot("B", h, 90 - 3 * h) for h in range(5)]
+    summary = FleetAnalytics.Summarize(FleetAnalytics.SnapshotHistory.FromSnapshots(snapshots))
+
+    a, b = summary["devices"]["A"], summary["devices"]["B"]
+    assert a["battery_drain_pct_per_hour"] == pytest.approx(2.0)
+    assert b["battery_drain_pct_per_hour"] == pytest.approx(3.0)
+    assert a["storage_growth_bytes_per_day"] == pytest.approx(24 * 1024 ** 3)
+    assert {app["package"]: app["share"] for app in a["foreground_apps"]} == {"com.a": 0.5, "com.b": 0.5}
+    assert summary["fleet"]["snapshots"] == 10
+
+
+def _WriteSnapshots(data_dir, snapshots):
+    for i, snapshot in enumerate(snapshots):
+        (data_dir / f"phone_data_{snapshot['Serial']}_{i}.json").write_text(json.dumps(snapshot), encoding="utf-8")
+
+
+def test_load_history_memory_maps_cache_and_rebuilds_on_new_files(tmp_path, monkeypatch):
+    data_dir, cache_dir = tmp_path / "data", tmp_path / "cache"
+    data_dir.mkdir()
+    _WriteSnapshots(data_dir, [_Snapshot("A", h, 100 - 2 * h) for h in range(3)])
+
+    history = FleetAnalytics.LoadHistory(str(data_dir), str(cache_dir))
+    assert len(history) == 3
+    assert all(isinstance(history[name], np.memmap) for name in FleetAnalytics.COLUMNS)
+    assert (cache_dir / "meta.json").exists()
+
+    # Unchanged sources are served from the cache without reading the JSON files again
+    with monkeypatch.context() as m:
+        m.setattr(FleetAnalytics, "_IterSnapshots", lambda files: pytest.fail("cache was rebuilt"))
+        assert len(FleetAnalytics.LoadHistory(str(data_dir), str(cache_dir))) == 3
+
+    (data_dir / "phone_data_B_0.json").write_text(json.dumps(_Snapshot("B", 0, 90)), encoding="utf-8")
+    history = FleetAnalytics.LoadHistory(str(data_dir), str(cache_dir))
+    assert len(history) == 4
+    assert history.devices == ["A", "B"]
+    assert isinstance(history["battery_level"], np.memmap)
+
+
+def test_missing_data_dir_is_an_error(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        FleetAnalytics.LoadHistory(str(tmp_path / "missing"))
+    with pytest.raises(FileNotFoundError):
+        FleetAnalytics.LoadHistory(str(tmp_path / "missing"), str(tmp_path / "cache"))
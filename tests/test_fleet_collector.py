@@ -0,0 +1,28 @@
+import pytest
+
+from conftest import FakeDevice, LoadFixture
+
+FleetCollector = pytest.importorskip("FleetCollector", exc_type=ImportError)
+
+RAW = LoadFixture("snapshot_raw.json")
+
+
+def test_collect_fleet_snapshot_parses_each_device():
+    good = [FakeDevice(RAW["commands"], serial=serial) for serial in ("SERIAL_A", "SERIAL_B")]
+    # A df header with no data columns makes ParseStorageInfo raise inside the worker
+    broken = FakeDevice({**RAW["commands"], "df -h /data": "Filesystem\n/dev/block/dm-48\n"}, serial="SERIAL_C")
+
+    with FleetCollector.FleetCollector(devices=good + [broken], parse_workers=2) as fleet:
+        results = fleet.CollectFleetSnapshot()
+
+    assert set(results) == {"SERIAL_A", "SERIAL_B", "SERIAL_C"}
+    for serial in ("SERIAL_A", "SERIAL_B"):
+        assert results[serial]["Serial"] == serial
+        assert results[serial]["Battery"]["level"] == "78"
+        assert results[serial]["Trace"]["Location"]["provider"] == "fused"
+    assert set(results["SERIAL_C"]) == {"error"}
+
+
+def test_no_devices_is_an_error():
+    with pytest.raises(RuntimeError):
+        FleetCollector.FleetCollector(devices=[])
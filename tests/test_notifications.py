@@ -0,0 +1,111 @@
+import Parsers
+from NotificationTracker import NotificationTracker
+from conftest import LoadFixture
+
+NOTIFICATIONS = LoadFixture("notification_noredact.txt")
+MEDIA = LoadFixture("media_session.txt")
+YOUTUBE_ACTIVITY = (
+    "  mResumedActivity: ActivityRecord{7f3 u0 com.google.android.youtube/"
+    "com.google.android.apps.youtube.app.watchwhile.WatchWhileActivity t41}\n"
+)
+
+
+def test_notification_records():
+    records = Parsers.ParseNotificationRecords(NOTIFICATIONS)
+
+    # The enqueued duplicate of the WhatsApp notification is dropped
+    assert [r["id"] for r in records] == [
+        "0|com.whatsapp|1|null|10150",
+        "-1|android|17040|null|1000",
+        "0|com.google.android.gm|5|abc|10200"
+    ]
+    assert records[0] == {
+        "id": "0|com.whatsapp|1|null|10150",
+        "package": "com.whatsapp",
+        "key": "0|com.whatsapp|1|null|10150",
+        "post_time": 1755853356000,
+        "channel": "msg",
+        "category": "msg"
+    }
+    assert records[2]["post_time"] == 1755853000000
+    assert records[2]["category"] == "email"
+
+
+def test_notifications_ignore_ranking_config():
+    result = Parsers.ParseNotifications(NOTIFICATIONS)
+
+    assert "com.spotify.music" not in result["active_notifications"]
+    assert result["active_notifications"] == ["com.whatsapp", "android", "com.google.android.gm"]
+    assert result["total_count"] == 3
+
+
+def test_media_sessions_skip_media_button_line():
+    sessions = Parsers.ParseMediaSessions(MEDIA)
+
+    assert [s["id"] for s in sessions] == [
+        "0|com.google.android.youtube|YouTube",
+        "0|com.spotify.music|spotify-media-session"
+    ]
+    youtube, spotify = sessions
+    assert youtube["state"] == "PAUSED"
+    assert youtube["position"] == 81234
+    assert (youtube["title"], youtube["artist"], youtube["album"]) == ("Some video", "Some channel", None)
+    assert spotify["state"] == "PLAYING"
+    assert spotify["speed"] == 1.0
+    assert (spotify["title"], spotify["artist"], spotify["album"]) == ("Song", "Artist", "Album")
+
+
+def test_media_sessions_without_headers():
+    raw = (
+        "Sessions Stack - have 2 sessions:\n"
+        "    package=com.foo\n"
+        "    state=PlaybackState {state=3, position=10, speed=1.0}\n"
+        "    package=com.bar\n"
+        "    state=PlaybackState {state=1, position=0, speed=0.0}\n"
+    )
+    sessions = Parsers.ParseMediaSessions(raw)
+
+    assert [(s["id"], s["state"]) for s in sessions] == [("com.foo|1", "PLAYING"), ("com.bar|1", "STOPPED")]
+
+
+def test_media_session_listed_twice_is_merged():
+    raw = MEDIA + "  Sessions Stack - have 1 sessions:\n    YouTube com.google.android.youtube/YouTube (userId=0)\n"
+    ids = [s["id"] for s in Parsers.ParseMediaSessions(raw)]
+
+    assert len(ids) == len(set(ids)) == 2
+
+
+def test_foreground_app_keeps_background_media():
+    app = Parsers.ParseForegroundAppDetailed(YOUTUBE_ACTIVITY, MEDIA)
+
+    assert app["package"] == "com.google.android.youtube"
+    assert app["media_session"]["id"] == "0|com.google.android.youtube|YouTube"
+    assert app["media_session"]["state"] == "PAUSED"
+    assert app["inferred_state"] == "Watching Video"
+    assert [s["package"] for s in app["background_media"]] == ["com.spotify.music"]
+
+
+def test_tracker_reports_only_changes():
+    tracker = NotificationTracker()
+    notifications = Parsers.ParseNotificationRecords(NOTIFICATIONS)
+    sessions = Parsers.ParseMediaSessions(MEDIA)
+
+    first = tracker.Update(notifications, sessions)
+    assert len(first["notifications_added"]) == 3
+    assert len(first["media_added"]) == 2
+
+    # Same poll again: nothing to report, even though a playing position would normally move
+    moved = [dict(s, position=(s["position"] or 0) + 5000) for s in sessions]
+    assert not any(tracker.Update(notifications, moved).values())
+
+    paused = [dict(s, state="PAUSED") for s in moved[1:]]
+    changes = tracker.Update(notifications[1:], paused)
+    assert [n["package"] for n in changes["notifications_removed"]] == ["com.whatsapp"]
+    assert changes["notifications_added"] == []
+    assert [s["package"] for s in changes["media_removed"]] == ["com.google.android.youtube"]
+    assert changes["media_changed"] == [
+        {"id": "0|com.spotify.music|spotify-media-session", "package": "com.spotify.music", "changed": {"state": "PAUSED"}}
+    ]
+
+    changes = tracker.Update(notifications, paused)
+    assert [n["package"] for n in changes["notifications_added"]] == ["com.whatsapp"]
@@ -0,0 +1,98 @@
+import copy
+
+import pytest
+
+import Parsers
+from conftest import FakeDevice, LoadFixture, RawSnapshot
+
+RAW = LoadFixture("snapshot_raw.json")
+# Produced by the pre-refactor PhoneDataCollector.CollectSnapshot / GetLocation on the same commands
+EXPECTED = LoadFixture("snapshot_expected.json")
+
+
+def _DropAdditions(snapshot):
+    """
+    Remove the fields added after the refactor (serial, notification records, media session ids)
+    so the rest can be compared with the pre-refactor output as-is
+    """
+    snapshot = copy.deepcopy(snapshot)
+    snapshot.pop("Serial", None)
+    # Both lists come from sets, so only their contents are comparable
+    snapshot["Recent Apps"] = sorted(snapshot["Recent Apps"])
+    messaging = snapshot["Trace"]["Messaging"]
+    messaging.pop("notifications", None)
+    messaging["active_notifications"] = sorted(messaging["active_notifications"])
+    for app in (snapshot["On Screen Running App"], snapshot["Trace"]["Media"]):
+        if "media_session" in app:
+            app["media_session"].pop("id", None)
+    return snapshot
+
+
+def test_parse_snapshot_matches_pre_refactor_output():
+    commands = RAW["commands"]
+    snapshot = Parsers.ParseSnapshot(RawSnapshot(commands))
+
+    assert snapshot["Serial"] == "FAKE0001"
+    assert _DropAdditions(snapshot) == _DropAdditions(EXPECTED["snapshot"])
+
+
+def test_parse_location_without_fix_matches_pre_refactor_output():
+    commands = {**RAW["commands"], **RAW["location_without_fix"]}
+    outputs = [(cmd, commands[cmd], None) for cmd in Parsers.LOCATION_COMMANDS]
+
+    assert Parsers.ParseLocation(RawSnapshot(commands, outputs)["location"]) == EXPECTED["location_without_fix"]
+
+
+def test_collect_snapshot_skips_fallback_commands():
+    DataExtractor = pytest.importorskip("DataExtractor", exc_type=ImportError)
+    device = FakeDevice(RAW["commands"])
+    snapshot = DataExtractor.PhoneDataCollector(device=device).CollectSnapshot()
+
+    assert _DropAdditions(snapshot) == _DropAdditions(EXPECTED["snapshot"])
+    assert "dumpsys location_manager" not in device.calls
+    assert "getprop | grep -i location" not in device.calls
+
+
+def test_collect_location_without_fix_runs_fallbacks():
+    DataExtractor = pytest.importorskip("DataExtractor", exc_type=ImportError)
+    device = FakeDevice({**RAW["commands"], **RAW["location_without_fix"]})
+
+    assert DataExtractor.PhoneDataCollector(device=device).GetLocation() == EXPECTED["location_without_fix"]
+    assert all(cmd in device.calls for cmd in Parsers.LOCATION_COMMANDS)
+
+
+def test_parse_location_skips_zero_fix_matches_pre_refactor_output():
+    commands = {**RAW["commands"], **RAW["location_fix_in_gps"]}
+    outputs = [(cmd, commands[cmd], None) for cmd in Parsers.LOCATION_COMMANDS]
+
+    assert Parsers.ParseLocation(RawSnapshot(commands, outputs)["location"]) == EXPECTED["location_fix_in_gps"]
+
+
+def test_collect_location_does_not_stop_on_zero_fix():
+    DataExtractor = pytest.importorskip("DataExtractor", exc_type=ImportError)
+    device = FakeDevice({**RAW["commands"], **RAW["location_fix_in_gps"]})
+
+    assert DataExtractor.PhoneDataCollector(device=device).GetLocation() == EXPECTED["location_fix_in_gps"]
+    assert "dumpsys gps" in device.calls
+    assert "getprop | grep -i location" not in device.calls
+
+
+def test_find_location_fix_validates_coordinates():
+    fix, errors = Parsers.FindLocationFix(RAW["commands"]["dumpsys location"])
+    assert (fix["lat"], fix["lon"], fix["provider"], fix["accuracy"]) == (28.6139, 77.209, "fused", 12.5)
+    assert errors == []
+
+    assert Parsers.FindLocationFix(RAW["location_fix_in_gps"]["dumpsys location"])[0] is None
+    # Android's own "Location[fused 28.6,77.2 ...]" form is not read by LOCATION_PATTERNS
+    assert Parsers.FindLocationFix(RAW["location_without_fix"]["dumpsys location"])[0] is None
+    assert Parsers.FindLocationFix("Location[28.6,77.2]")[0] is None
+
+
+def test_screen_state_uses_window_flags_before_power():
+    window = "    mShowingLockscreen=true mShowingDream=false mDreamingLockscreen=false\n"
+
+    assert Parsers.HasLockscreenState(window)
+    assert Parsers.ParseScreenState(window) == "Locked"
+    assert Parsers.ParseScreenState(window.replace("=true", "=false")) == "Unlocked"
+    assert not Parsers.HasLockscreenState(RAW["commands"]["dumpsys window"])
+    assert Parsers.ParseScreenState(RAW["commands"]["dumpsys window"], RAW["commands"]["dumpsys power"]) == "Unlocked"
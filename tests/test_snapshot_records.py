@@ -0,0 +1,92 @@
+import pytest
+
+import Parsers
+from conftest import LoadFixture, RawSnapshot
+from SnapshotRecords import (
+    BatteryRecord, NetworkRecord, NotificationRecord, NotificationsRecord, ParseSize, SnapshotRecord
+)
+
+
+def _Snapshot():
+    commands = dict(LoadFixture("snapshot_raw.json")["commands"])
+    commands["dumpsys media_session"] = LoadFixture("media_session.txt")
+    commands["dumpsys notification --noredact"] = LoadFixture("notification_noredact.txt")
+    return Parsers.ParseSnapshot(RawSnapshot(commands))
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("110G", 110 * 1024 ** 3),
+    ("1.5G", int(1.5 * 1024 ** 3)),
+    ("512M", 512 * 1024 ** 2),
+    ("12Gi", 12 * 1024 ** 3),
+    ("12GB", 12 * 1024 ** 3),
+    ("4.0K", 4096),
+    ("2T", 2 * 1024 ** 4),
+    ("100", 100),
+    ("Unknown", None),
+    ("12X", None),
+    ("", None),
+    (None, None)
+])
+def test_parse_size(value, expected):
+    assert ParseSize(value) == expected
+
+
+def test_battery_known_fields_are_typed_and_the_rest_kept_in_extra():
+    battery = BatteryRecord.FromSnapshot(_Snapshot()["Battery"])
+
+    assert (battery.level, battery.scale, battery.status, battery.health) == (78, 100, "Charging", "Good")
+    assert (battery.usb_powered, battery.ac_powered, battery.present) == (True, False, True)
+    assert (battery.voltage_mv, battery.temperature_decic, battery.charge_counter_uah) == (4182, 291, 3012000)
+    assert battery.percent == 78.0
+    assert battery.extra == {
+        "Current Battery Service state": None,
+        "Max charging current": "500000",
+        "Max charging voltage": "5000000"
+    }
+    assert BatteryRecord.FromSnapshot({"level": "78"}).extra is None
+
+
+def test_network_placeholders_become_none():
+    network = NetworkRecord.FromSnapshot(
+        {"wifi_ssid": "Not Connected", "wifi_rssi": "Unknown", "ip_addr": "Unknown", "sim_carrier": "No SIM"}
+    )
+
+    assert network == NetworkRecord()
+
+
+def test_from_dict_rebuilds_nested_tuples():
+    messaging = NotificationsRecord.FromSnapshot(_Snapshot()["Trace"]["Messaging"])
+    rebuilt = NotificationsRecord.FromDict(messaging.ToDict())
+
+    assert rebuilt == messaging
+    assert isinstance(rebuilt.active_notifications, tuple)
+    assert isinstance(rebuilt.notifications, tuple)
+    assert all(isinstance(n, NotificationRecord) for n in rebuilt.notifications)
+    assert rebuilt.total_count == len(messaging.active_notifications)
+
+
+def test_snapshot_round_trips_through_json():
+    snapshot = _Snapshot()
+    record = SnapshotRecord.FromSnapshot(snapshot)
+
+    assert SnapshotRecord.FromJson(record.ToJson()) == record
+    assert record.serial == "FAKE0001"
+    assert record.storage.used_bytes == 61 * 1024 ** 3
+    assert record.foreground.media_session.id == "0|com.google.android.youtube|YouTube"
+    assert [m.package for m in record.foreground.background_media] == ["com.spotify.music"]
+    assert len(record.trace.messaging.notifications) == len(snapshot["Trace"]["Messaging"]["notifications"])
+    assert record.trace.location.provider == "fused"
+
+
+def test_from_json_interns_repeated_strings():
+    text = SnapshotRecord.FromSnapshot(_Snapshot()).ToJson()
+    a, b = SnapshotRecord.FromJson(text), SnapshotRecord.FromJson(text)
+
+    assert a.serial is b.serial
+    assert a.device.model is b.device.model
+    assert a.battery.status is b.battery.status
+    assert a.recent_apps[0] is b.recent_apps[0]
+    assert a.foreground.package is b.foreground.package
+    assert a.trace.messaging.active_notifications[0] is b.trace.messaging.active_notifications[0]
+    assert a.trace.messaging.notifications[0].package is b.trace.messaging.notifications[0].package